@@ -0,0 +1,149 @@
+use glam::IVec2 as Vec2;
+use crate::pieces::{PieceColor, PieceType};
+use crate::tables::{BETWEEN, BISHOP_DIRECTIONS, KING_ATTACKS, KNIGHT_ATTACKS, LINE, PAWN_ATTACKS, RAYS, ROOK_DIRECTIONS};
+
+pub type Bitboard = u64;
+
+/// Square index (0..64) of a board position, a1 = 0, h8 = 63.
+#[inline]
+pub fn square(pos: Vec2) -> Option<usize> {
+    if (pos.x < 1) || (pos.x > 8) || (pos.y < 1) || (pos.y > 8) {
+        return None;
+    }
+    Some(((pos.y - 1) * 8 + (pos.x - 1)) as usize)
+}
+
+#[inline]
+pub fn square_to_pos(sq: usize) -> Vec2 {
+    Vec2::new((sq % 8) as i32 + 1, (sq / 8) as i32 + 1)
+}
+
+#[inline]
+pub fn bit(sq: usize) -> Bitboard {
+    1 << sq
+}
+
+#[inline]
+pub fn knight_attacks(sq: usize) -> Bitboard {
+    KNIGHT_ATTACKS[sq]
+}
+
+#[inline]
+pub fn king_attacks(sq: usize) -> Bitboard {
+    KING_ATTACKS[sq]
+}
+
+/// Squares attacked by a pawn of `color` standing on `sq`.
+#[inline]
+pub fn pawn_attacks(color: PieceColor, sq: usize) -> Bitboard {
+    PAWN_ATTACKS[color as usize][sq]
+}
+
+fn ray_attacks(sq: usize, occupied: Bitboard, directions: &[usize]) -> Bitboard {
+    let mut attacks = 0;
+    for &dir in directions {
+        let ray = RAYS[dir][sq];
+        let blockers = ray & occupied;
+        if blockers == 0 {
+            attacks |= ray;
+            continue;
+        }
+        let blocker = match dir {
+            0..=3 => blockers.trailing_zeros() as usize,
+            _ => 63 - blockers.leading_zeros() as usize,
+        };
+        attacks |= ray ^ RAYS[dir][blocker];
+    }
+    attacks
+}
+
+#[inline]
+pub fn rook_attacks(sq: usize, occupied: Bitboard) -> Bitboard {
+    ray_attacks(sq, occupied, &ROOK_DIRECTIONS)
+}
+
+#[inline]
+pub fn bishop_attacks(sq: usize, occupied: Bitboard) -> Bitboard {
+    ray_attacks(sq, occupied, &BISHOP_DIRECTIONS)
+}
+
+/// Squares strictly between two squares on a shared rank, file or diagonal.
+#[inline]
+pub fn between(from: usize, to: usize) -> Bitboard {
+    BETWEEN[from][to]
+}
+
+/// Full rank, file or diagonal through two squares, empty if they share none.
+#[inline]
+pub fn line(from: usize, to: usize) -> Bitboard {
+    LINE[from][to]
+}
+
+/// Iterates over the square indices of the set bits, lowest first.
+pub fn iter_bits(mut bitboard: Bitboard) -> impl Iterator<Item = usize> {
+    std::iter::from_fn(move || {
+        if bitboard == 0 {
+            return None;
+        }
+        let sq = bitboard.trailing_zeros() as usize;
+        bitboard &= bitboard - 1;
+        Some(sq)
+    })
+}
+
+/// Piece placement of the standard 8x8 board, one bitboard per color and piece type.
+#[derive(Debug, Clone, Default)]
+pub struct Bitboards {
+    pieces: [[Bitboard; 6]; 2],
+    colors: [Bitboard; 2],
+    occupied: Bitboard,
+}
+
+impl Bitboards {
+    pub fn new() -> Bitboards {
+        Bitboards::default()
+    }
+
+    #[inline]
+    pub fn toggle(&mut self, piece_color: PieceColor, piece_type: PieceType, sq: usize) {
+        if piece_type == PieceType::NULL {
+            return;
+        }
+        self.pieces[piece_color as usize][piece_type as usize - 1] ^= bit(sq);
+        self.colors[piece_color as usize] ^= bit(sq);
+        self.occupied ^= bit(sq);
+    }
+
+    #[inline]
+    pub fn get(&self, piece_color: PieceColor, piece_type: PieceType) -> Bitboard {
+        if piece_type == PieceType::NULL {
+            return 0;
+        }
+        self.pieces[piece_color as usize][piece_type as usize - 1]
+    }
+
+    #[inline]
+    pub fn color(&self, piece_color: PieceColor) -> Bitboard {
+        self.colors[piece_color as usize]
+    }
+
+    #[inline]
+    pub fn occupied(&self) -> Bitboard {
+        self.occupied
+    }
+
+    /// Pieces of color `by` attacking `sq`, given the occupancy `occupied`.
+    pub fn attackers_to(&self, sq: usize, by: PieceColor, occupied: Bitboard) -> Bitboard {
+        let defender = by.opposite();
+        let queens = self.get(by, PieceType::QUEEN);
+        (pawn_attacks(defender, sq) & self.get(by, PieceType::PAWN))
+            | (knight_attacks(sq) & self.get(by, PieceType::KNIGHT))
+            | (king_attacks(sq) & self.get(by, PieceType::KING))
+            | (rook_attacks(sq, occupied) & (self.get(by, PieceType::ROOK) | queens))
+            | (bishop_attacks(sq, occupied) & (self.get(by, PieceType::BISHOP) | queens))
+    }
+
+    pub fn is_square_attacked(&self, sq: usize, by: PieceColor) -> bool {
+        self.attackers_to(sq, by, self.occupied) != 0
+    }
+}
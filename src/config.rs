@@ -1,4 +1,5 @@
 use glam::IVec2 as Vec2;
+use crate::bitboard::{bit, Bitboard};
 
 #[derive(Debug, Clone)]
 pub struct Config {
@@ -16,4 +17,19 @@ impl Config {
         let promotion_lines = vec![1,8];
         Config { boundaries, promotion_lines }
     }
-}
\ No newline at end of file
+    
+    /// Squares of the 8x8 board that lie strictly inside the boundaries.
+    pub fn bounds_mask(&self) -> Bitboard {
+        let top_left = self.boundaries[0];
+        let bottom_right = self.boundaries[1];
+        let mut mask = 0;
+        for y in 1..9 {
+            for x in 1..9 {
+                if (x > top_left.x) && (x < bottom_right.x) && (y > bottom_right.y) && (y < top_left.y) {
+                    mask |= bit(((y - 1) * 8 + (x - 1)) as usize);
+                }
+            }
+        }
+        mask
+    }
+}
@@ -1,4 +1,7 @@
+pub mod bitboard;
 pub mod pieces;
 pub mod state;
 pub mod moves;
-pub mod config;
\ No newline at end of file
+pub mod config;
+pub mod tables;
+pub mod zobrist;
\ No newline at end of file
@@ -9,27 +9,18 @@ fn main() {
     println!("{}", state);
     
     let piece = state.get_piece_at(Vec2::new(4, 1)).unwrap().clone();
-    let mut gen = Generator::new(piece, state);
-    let mut i: i128 = 0;
+    let gen = Generator::new(piece, state);
     let start = Instant::now();
-    loop {
-        if i > 100 {
-            break;
-        }
-        i += 1;
-        let piece_move = gen.next_pseudo();
-        match piece_move {
-            None => {},
-            Some(_) => println!("{} {} {} {:?} {} {:?} {}",
-                piece_move.as_ref().unwrap().piece,
-                piece_move.as_ref().unwrap().start,
-                piece_move.as_ref().unwrap().end,
-                piece_move.as_ref().unwrap().promotion,
-                piece_move.as_ref().unwrap().castling,
-                piece_move.as_ref().unwrap().castling_target,
-                piece_move.as_ref().unwrap().en_passant,
-            )
-        }
+    for piece_move in gen {
+        println!("{} {} {} {:?} {} {:?} {}",
+            piece_move.piece,
+            piece_move.start,
+            piece_move.end,
+            piece_move.promotion,
+            piece_move.castling,
+            piece_move.castling_target,
+            piece_move.en_passant,
+        )
     }
     println!("{:?}", start.elapsed())
 }
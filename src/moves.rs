@@ -1,10 +1,12 @@
 use core::fmt;
+use std::collections::{HashMap, VecDeque};
 
 use glam::IVec2 as Vec2;
+use crate::bitboard::{between, bit, iter_bits, king_attacks, knight_attacks, square, square_to_pos, Bitboard};
 use crate::pieces::{Piece, PieceColor, PieceType};
 use crate::state::State;
 
-#[derive(Debug, Clone)]
+#[derive(Debug, Clone, Copy)]
 pub struct Move {
     pub start: Vec2,
     pub end: Vec2,
@@ -16,6 +18,8 @@ pub struct Move {
     pub promotion: Option<PieceType>,
 }
 
+const _: () = assert!(std::mem::size_of::<Move>() <= 56);
+
 impl Move {
     pub fn new(start: Vec2, end: Vec2, piece: Piece, target: Option<Piece>,  promotion: Option<PieceType>, castling: bool, castling_target: Option<Piece>, en_passant: bool) -> Move {
         Move { start, end, piece, target, castling, castling_target, en_passant, promotion }
@@ -62,12 +66,82 @@ impl fmt::Display for Move {
     }
 }
 
+/// Legal targets per (position hash, piece square), evicted oldest first once full.
+pub struct MoveCache {
+    capacity: usize,
+    targets: HashMap<(u64, usize), Bitboard>,
+    order: VecDeque<(u64, usize)>,
+}
+
+impl MoveCache {
+    pub fn new(capacity: usize) -> MoveCache {
+        let capacity = capacity.max(1);
+        MoveCache { capacity, targets: HashMap::with_capacity(capacity), order: VecDeque::with_capacity(capacity) }
+    }
+    
+    pub fn default() -> MoveCache {
+        MoveCache::new(1 << 16)
+    }
+    
+    pub fn len(&self) -> usize {
+        self.targets.len()
+    }
+    
+    pub fn get_targets(&mut self, state: &State, pos: Vec2) -> Bitboard {
+        let sq = match square(pos) {
+            Some(sq) => sq,
+            None => return 0,
+        };
+        let key = (state.get_hash(), sq);
+        if let Some(&targets) = self.targets.get(&key) {
+            return targets;
+        }
+        
+        let mut targets = 0;
+        for piece_move in state.generate_piece_moves(pos) {
+            targets |= bit(square(piece_move.end).unwrap());
+        }
+        if self.targets.len() >= self.capacity {
+            let oldest = self.order.pop_front().unwrap();
+            self.targets.remove(&oldest);
+        }
+        self.targets.insert(key, targets);
+        self.order.push_back(key);
+        targets
+    }
+    
+    pub fn is_possible_move(&mut self, state: &State, start: Vec2, end: Vec2) -> bool {
+        match square(end) {
+            Some(end_sq) => self.get_targets(state, start) & bit(end_sq) != 0,
+            None => false,
+        }
+    }
+}
+
+const STRAIGHT: [Vec2; 4] = [Vec2::new( 1,  0), Vec2::new(-1,  0), Vec2::new( 0, -1), Vec2::new( 0,  1)];
+const DIAGONAL: [Vec2; 4] = [Vec2::new( 1,  1), Vec2::new( 1, -1), Vec2::new(-1,  1), Vec2::new(-1, -1)];
+const COMBINED: [Vec2; 8] = [
+    Vec2::new( 1,  0), Vec2::new(-1,  0), Vec2::new( 0, -1), Vec2::new( 0,  1),
+    Vec2::new( 1,  1), Vec2::new( 1, -1), Vec2::new(-1,  1), Vec2::new(-1, -1),
+];
+//move forward, left att, right att
+const WHITE_PAWN_OFFSETS: [Vec2; 3] = [Vec2::new(0, 1), Vec2::new(-1, 1), Vec2::new(1, 1)];
+const BLACK_PAWN_OFFSETS: [Vec2; 3] = [Vec2::new(0, -1), Vec2::new(1, -1), Vec2::new(-1, -1)];
+const PAWN_PROMOTIONS: [Option<PieceType>; 5] = [
+    Some(PieceType::BISHOP),
+    Some(PieceType::KNIGHT),
+    Some(PieceType::ROOK),
+    Some(PieceType::QUEEN),
+    None,
+];
+
 pub struct Generator {
     n: Vec<usize>,
     buffer: Vec<Move>,
     piece: Piece,
     state: State,
-    offsets: Option<Vec<Vec2>>,
+    offsets: Option<&'static [Vec2]>,
+    bounds: Bitboard,
 }
 
 impl Generator {
@@ -84,46 +158,56 @@ impl Generator {
         
         let n = vec![0; n];
         
-        let straight: Vec<Vec2> = vec![Vec2::new( 1,  0), Vec2::new(-1,  0), Vec2::new( 0, -1), Vec2::new( 0,  1)];
-        let diagonal: Vec<Vec2> = vec![Vec2::new( 1,  1), Vec2::new( 1, -1), Vec2::new(-1,  1), Vec2::new(-1, -1),];
-        let combined: Vec<Vec2> = [straight.clone(), diagonal.clone()].concat();
-        
-        let offsets: Option<Vec<Vec2>> = match piece.get_piece_type() {
+        let offsets: Option<&'static [Vec2]> = match piece.get_piece_type() {
             PieceType::PAWN => {None} ,
             PieceType::KNIGHT => {None},
-            PieceType::BISHOP => {Some(diagonal.clone())},
-            PieceType::ROOK => {Some(straight.clone())},
-            PieceType::QUEEN => {Some(combined.clone())},
+            PieceType::BISHOP => {Some(&DIAGONAL)},
+            PieceType::ROOK => {Some(&STRAIGHT)},
+            PieceType::QUEEN => {Some(&COMBINED)},
             PieceType::KING => {None},
             _ => {None},
         };
-        let buffer = vec![];
-        Generator { n, buffer, piece, state, offsets }
+        let buffer = Vec::with_capacity(n.len() * 2);
+        let bounds = state.config.bounds_mask();
+        Generator { n, buffer, piece, state, offsets, bounds }
     }
     
     pub fn is_depleated(&self) -> bool {
-        let min_n = self.n.iter().min().unwrap().clone();
-        if min_n == usize::MAX {
-            true
+        self.n.iter().all(|&n| n == usize::MAX)
+    }
+    
+    pub fn is_exhausted(&self) -> bool {
+        self.buffer.is_empty() && self.is_depleated()
+    }
+    
+    fn deplete(&mut self) {
+        for idx in 0..self.n.len() {
+            self.n[idx] = usize::MAX;
         }
-        else {
-            false
+    }
+    
+    // queue every in-bounds target of a leaper from its attack table, no offsets can misfire
+    fn push_step_moves(&mut self, attacks: fn(usize) -> Bitboard) {
+        let start = self.piece.get_position().clone();
+        let sq = match square(start) {
+            Some(sq) => sq,
+            None => return,
+        };
+        for target_sq in iter_bits(attacks(sq) & self.bounds) {
+            let end = square_to_pos(target_sq);
+            self.buffer.push(Move::new(start, end, self.piece.clone(), None, None, false, None, false));
         }
     }
     
     fn is_in_bounds(&self, point: Vec2) -> bool {
-        let top_left = self.state.config.boundaries[0];
-        let bottom_right = self.state.config.boundaries[1];
-        if (point.x < bottom_right.x) && (point.x > top_left.x) {
-            if (point.y > bottom_right.y) && (point.y < top_left.y) {
-                return true;
-            }
+        match square(point) {
+            Some(sq) => self.bounds & bit(sq) != 0,
+            None => false,
         }
-        false
     }
     
     pub fn reset(&mut self) {
-        self.buffer = vec![];
+        self.buffer.clear();
         for idx in 0..self.n.len() {
             self.n[idx] = 0;
         }
@@ -133,19 +217,10 @@ impl Generator {
         if self.buffer.len() > 0 {
             return self.buffer.pop();
         }
-        //move forward, left att, right att
-        let offsets = match self.piece.get_color() {
-            PieceColor::WHITE => vec![Vec2::new(0, 1), Vec2::new(-1, 1), Vec2::new(1, 1)],
-            PieceColor::BLACK => vec![Vec2::new(0, -1), Vec2::new(1, -1), Vec2::new(-1, -1)]
+        let offsets: &[Vec2] = match self.piece.get_color() {
+            PieceColor::WHITE => &WHITE_PAWN_OFFSETS,
+            PieceColor::BLACK => &BLACK_PAWN_OFFSETS,
         };
-        let promotions: Vec<Option<PieceType>> = 
-            vec![
-                Some(PieceType::BISHOP),
-                Some(PieceType::KNIGHT),
-                Some(PieceType::ROOK),
-                Some(PieceType::QUEEN),
-                None,
-            ];
         
         for idx in 0..self.n.len() {
             if self.n[idx] != 0 {
@@ -164,7 +239,7 @@ impl Generator {
                     self.n[idx] = usize::MAX;
                     continue;
                 }
-                for promotion in promotions.iter() {
+                for promotion in PAWN_PROMOTIONS.iter() {
                     for en_passant in [true, false].iter() {
                         self.buffer.push(
                             Move::new(start, end, self.piece.clone(), None, promotion.clone(), false, None, en_passant.to_owned())
@@ -181,31 +256,15 @@ impl Generator {
     }
     
     fn next_knight_offset(&mut self) -> Option<Move> {
-        let offsets: Vec<Vec2> =
-            vec![
-                Vec2::new(-1,  2),
-                Vec2::new( 1,  2),
-                Vec2::new(-1, -2),
-                Vec2::new( 1, -2),
-                Vec2::new( 2, -1),
-                Vec2::new( 2,  1),
-                Vec2::new(-2, -1),
-                Vec2::new(-2,  1),
-            ];
-        for idx in 0..self.n.len() {
-            if self.n[idx] != 0 {
-                self.n[idx] = usize::MAX;
-                continue;
-            }
-            let start = self.piece.get_position().clone();
-            let end = self.piece.get_position().clone() + offsets[idx];
-            self.n[idx] = usize::MAX;
-            if !self.is_in_bounds(end) {
-                return None;
-            }
-            return Some(Move::new(start, end, self.piece.clone(), None, None, false, None, false));
+        if self.buffer.len() > 0 {
+            return self.buffer.pop();
         }
-        None
+        if self.is_depleated() {
+            return None;
+        }
+        self.push_step_moves(knight_attacks);
+        self.deplete();
+        self.buffer.pop()
     }
     
     fn next_bishop_offset(&mut self) -> Option<Move> {
@@ -216,7 +275,7 @@ impl Generator {
         
         let idx = self.n.iter().position(|&r| r == min_n).unwrap();
         self.n[idx] += 1;
-        let offset = self.offsets.as_ref().unwrap()[idx] * self.n[idx] as i32;
+        let offset = self.offsets.unwrap()[idx] * self.n[idx] as i32;
         let start = self.piece.get_position().clone();
         let end = self.piece.get_position().clone() + offset;
         if !self.is_in_bounds(end) {
@@ -237,7 +296,7 @@ impl Generator {
         
         let idx = self.n.iter().position(|&r| r == min_n).unwrap();
         self.n[idx] += 1;
-        let offset = self.offsets.as_ref().unwrap()[idx] * self.n[idx] as i32;
+        let offset = self.offsets.unwrap()[idx] * self.n[idx] as i32;
         let start = self.piece.get_position().clone();
         let end = self.piece.get_position().clone() + offset;
         if !self.is_in_bounds(end) {
@@ -263,7 +322,7 @@ impl Generator {
         
         let idx = self.n.iter().position(|&r| r == min_n).unwrap();
         self.n[idx] += 1;
-        let offset = self.offsets.as_ref().unwrap()[idx] * self.n[idx] as i32;
+        let offset = self.offsets.unwrap()[idx] * self.n[idx] as i32;
         let start = self.piece.get_position().clone();
         let end = self.piece.get_position().clone() + offset;
         if !self.is_in_bounds(end) {
@@ -277,31 +336,10 @@ impl Generator {
         if self.buffer.len() > 0 {
             return self.buffer.pop()
         }
-        let offsets: Vec<Vec2> =
-            vec![
-                Vec2::new( 1,  0),
-                Vec2::new(-1,  0),
-                Vec2::new( 0, -1),
-                Vec2::new( 0,  1),
-                Vec2::new( 1,  1),
-                Vec2::new( 1, -1),
-                Vec2::new(-1,  1),
-                Vec2::new(-1, -1),
-            ];
-        for idx in 0..offsets.len() {
-            if self.n[idx] != 0 {
-                continue;
-            }
-            let start = self.piece.get_position().clone();
-            let end = self.piece.get_position().clone() + offsets[idx];
-            if !self.is_in_bounds(end) {
-                self.n[idx] = usize::MAX;
-                continue;
-            }
-            self.n[idx] = usize::MAX;
-            
-            self.buffer.push(Move::new(start, end, self.piece.clone(), None, None, false, None, false));
+        if self.is_depleated() {
+            return None;
         }
+        self.push_step_moves(king_attacks);
         if !self.piece.has_moved() {
             let rooks = self.state.find(PieceType::ROOK, self.piece.get_color());
             for rook in rooks {
@@ -322,6 +360,7 @@ impl Generator {
                 }
             }
         }
+        self.deplete();
         self.buffer.pop()
     }
     
@@ -338,7 +377,7 @@ impl Generator {
     }
     
     fn is_color_correct(&self) -> bool {
-        return self.piece.get_color() == self.state.to_move;
+        return self.piece.get_color() == self.state.get_to_move();
     }
     
     fn check_pawn_offset(&self, offset_move: &Move) -> bool {
@@ -387,25 +426,22 @@ impl Generator {
     }
     
     fn check_diagonal_offset(&mut self, offset_move: &Move) -> bool {
-        let mut offset = offset_move.end - offset_move.start;
-        if offset.abs().max_element() == 0 {
+        let offset = offset_move.end - offset_move.start;
+        if offset == Vec2::ZERO {
             return false;
         }
-        offset /= offset.abs().max_element();
+        let direction = offset.signum();
         
         // path blocked, dont generate more moves in that direction
         if !offset_move.target.is_none() {
-            let local_offsets = self.offsets.clone().unwrap();
-            for idx in 0..local_offsets.len() {
-                if offset == local_offsets[idx] {
-                    self.n[idx] = usize::MAX;
-                    break;
-                }
+            let blocked = self.offsets.unwrap().iter().position(|&local_offset| local_offset == direction);
+            if let Some(idx) = blocked {
+                self.n[idx] = usize::MAX;
             }
         }
         
         // is diagonal?
-        if offset.abs().x != offset.abs().y {
+        if offset.x.abs() != offset.y.abs() {
             return false;
         }
         
@@ -413,25 +449,22 @@ impl Generator {
     }
 
     fn check_horizontal_offset(&mut self, offset_move: &Move) -> bool {
-        let mut offset = offset_move.end - offset_move.start;
-        if offset.abs().max_element() == 0 {
+        let offset = offset_move.end - offset_move.start;
+        if offset == Vec2::ZERO {
             return false;
         }
-        offset /= offset.abs().max_element();
+        let direction = offset.signum();
         
         // path blocked, dont generate more moves in that direction
         if !offset_move.target.is_none() {
-            let local_offsets = self.offsets.clone().unwrap();
-            for idx in 0..local_offsets.len() {
-                if offset == local_offsets[idx] {
-                    self.n[idx] = usize::MAX;
-                    break;
-                }
+            let blocked = self.offsets.unwrap().iter().position(|&local_offset| local_offset == direction);
+            if let Some(idx) = blocked {
+                self.n[idx] = usize::MAX;
             }
         }
         
         // is horizontal?
-        if (offset.abs().x != 0) && (offset.abs().y != 0) {
+        if (offset.x != 0) && (offset.y != 0) {
             return false;
         }
         
@@ -440,18 +473,14 @@ impl Generator {
     
     fn check_king_offset(&self, offset_move: &Move) -> bool {
         if offset_move.castling {
-            let mut offset = offset_move.end - offset_move.start;
-            offset /= offset.abs().x;
-            let mut checked_point = offset_move.start + offset;
-            loop {
-                if checked_point == offset_move.end {
-                    break;
-                }
-                let found_piece = self.state.get_piece_at(checked_point);
-                if (!found_piece.is_none()) && (found_piece.unwrap().get_piece_type() != PieceType::ROOK) && (!found_piece.unwrap().has_moved()) {
-                    return false;
-                }
-                checked_point += offset;
+            let start = square(offset_move.start);
+            let end = square(offset_move.end);
+            if start.is_none() || end.is_none() {
+                return false;
+            }
+            // path between king and rook must be empty
+            if between(start.unwrap(), end.unwrap()) & self.state.get_bitboards().occupied() != 0 {
+                return false;
             }
         }
         true
@@ -531,7 +560,33 @@ impl Generator {
         Some(offset_move)
     }
     
-    //pub fn next(&self) -> Move {
-    //    
-    //}
-}
\ No newline at end of file
+    pub fn next_legal(&mut self) -> Option<Move> {
+        let offset_move = self.next_pseudo();
+        if offset_move.is_none() {
+            return None;
+        }
+        let offset_move = offset_move.unwrap();
+        
+        // does the move leave own king in check?
+        if !self.state.is_legal(&offset_move) {
+            return None;
+        }
+        
+        Some(offset_move)
+    }
+}
+
+impl Iterator for Generator {
+    type Item = Move;
+    
+    // pseudo-legal moves, skipping offsets that were rejected
+    fn next(&mut self) -> Option<Move> {
+        while !self.is_exhausted() {
+            let offset_move = self.next_pseudo();
+            if !offset_move.is_none() {
+                return offset_move;
+            }
+        }
+        None
+    }
+}
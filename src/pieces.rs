@@ -2,11 +2,14 @@ use glam::IVec2 as Vec2;
 use core::fmt;
 
 #[derive(Debug, PartialEq, Clone, Copy)]
+#[repr(u8)]
 pub enum PieceColor {
-    BLACK,
-    WHITE
+    BLACK = 0,
+    WHITE = 1
 }
 
+const COLORS: [PieceColor; 2] = [PieceColor::BLACK, PieceColor::WHITE];
+
 impl PieceColor {
     pub fn from_bool(value: bool) -> PieceColor {
         match value {
@@ -14,6 +17,10 @@ impl PieceColor {
             true => PieceColor::WHITE
         }
     }
+    
+    pub fn opposite(&self) -> PieceColor {
+        COLORS[(*self as usize) ^ 1]
+    }
 }
 
 #[derive(Debug, PartialEq, Clone, Copy)]
@@ -40,11 +47,34 @@ impl PieceType {
             _ => PieceType::NULL,
         }
     }
+    
+    pub fn from_symbol(symbol: char) -> PieceType {
+        match symbol.to_ascii_lowercase() {
+            'p' => PieceType::PAWN,
+            'n' => PieceType::KNIGHT,
+            'b' => PieceType::BISHOP,
+            'r' => PieceType::ROOK,
+            'q' => PieceType::QUEEN,
+            'k' => PieceType::KING,
+            _ => PieceType::NULL,
+        }
+    }
+    
+    pub fn to_symbol(&self) -> char {
+        match self {
+            PieceType::NULL => 'x',
+            PieceType::PAWN => 'p',
+            PieceType::KNIGHT => 'n',
+            PieceType::BISHOP => 'b',
+            PieceType::ROOK => 'r',
+            PieceType::QUEEN => 'q',
+            PieceType::KING => 'k',
+        }
+    }
 }
 
 pub fn name_to_type(name: String) -> PieceType {
-    let name: &str = &format!("{}", name.to_lowercase());
-    match name {
+    match name.to_ascii_lowercase().as_str() {
         "pawn" => PieceType::PAWN,
         "knight" => PieceType::KNIGHT,
         "bishop" => PieceType::BISHOP,
@@ -68,8 +98,7 @@ pub fn type_to_name(piece_type: PieceType) -> String {
 }
 
 pub fn name_to_symbol(name: String) -> char {
-    let name: &str = &format!("{}", name.to_lowercase());
-    match name {
+    match name.to_ascii_lowercase().as_str() {
         "pawn" => 'p',
         "knight" => 'n',
         "bishop" => 'b',
@@ -93,7 +122,7 @@ pub fn symbol_to_name(symbol: char) -> String {
     }
 }
 
-#[derive(Debug, Clone, PartialEq)]
+#[derive(Debug, Clone, Copy, PartialEq)]
 pub struct Piece {
     color: PieceColor,
     has_moved: bool,
@@ -102,6 +131,9 @@ pub struct Piece {
     position: Vec2,
 }
 
+// pieces are copied into every generated move, keep them small
+const _: () = assert!(std::mem::size_of::<Piece>() <= 12);
+
 impl Piece {
     pub fn new(piece_color: PieceColor, piece_type: PieceType, position: Vec2) -> Piece {
         Piece {color: piece_color, has_moved: false, is_alive: true, piece_type, position}
@@ -131,12 +163,16 @@ impl Piece {
         return self.piece_type
     }
     
+    pub fn promote(&mut self, piece_type: PieceType) {
+        self.piece_type = piece_type
+    }
+    
     pub fn get_name(&self) -> String {
         type_to_name(self.get_piece_type())
     }
     
     pub fn get_symbol(&self) -> char {
-        let symbol = name_to_symbol(type_to_name(self.get_piece_type()));
+        let symbol = self.get_piece_type().to_symbol();
         match self.get_color() {
             PieceColor::BLACK => symbol,
             PieceColor::WHITE => symbol.to_ascii_uppercase()
@@ -1,13 +1,29 @@
 use core::fmt;
 use std::usize;
 
-use crate::{moves::Move, pieces::{name_to_type, symbol_to_name, Piece, PieceColor, PieceType}, config::Config};
+use crate::{bitboard::{between, bishop_attacks, bit, iter_bits, king_attacks, knight_attacks, line, pawn_attacks, rook_attacks, square, square_to_pos, Bitboard, Bitboards}, moves::Move, pieces::{Piece, PieceColor, PieceType}, config::Config, zobrist::{castling_key, en_passant_key, piece_key, SIDE_KEY}};
 use glam::IVec2 as Vec2;
 
+/// Upper bound on legal moves in any reachable chess position.
+pub const MAX_MOVES: usize = 256;
+
+// king and rook home squares of each castling right
+const CASTLING_SQUARES: [(usize, usize, PieceColor); 4] = [
+    (4, 7, PieceColor::WHITE),
+    (4, 0, PieceColor::WHITE),
+    (60, 63, PieceColor::BLACK),
+    (60, 56, PieceColor::BLACK),
+];
+
 #[derive(Debug, Clone)]
 pub struct State {
     pieces: Vec<Piece>,
-    pub to_move: PieceColor,
+    mailbox: [Option<u8>; 64],
+    bitboards: Bitboards,
+    hash: u64,
+    checkers: Bitboard,
+    pinned: Bitboard,
+    to_move: PieceColor,
     pub half_moves: usize,
     pub full_moves: usize,
     pub config: Config,
@@ -16,137 +32,550 @@ pub struct State {
 
 impl State {
     pub fn from_fen(fen: String) -> State {
-        let mut pieces = vec![];
+        let mut pieces = Vec::with_capacity(32);
         let mut x: i32 = 1;
         let mut y: i32 = 8;
         
         for symbol in fen.chars() {
-            if symbol == ' ' {
-                break;
-            }
-            if symbol == '/' {
-                y -= 1;
-                x = 1;
-                continue;
-            }
-            if symbol.is_digit(10) {
-                x += symbol as i32 - '0' as i32;
-                continue;
-            }
-            let piece_color;
-            if symbol.is_lowercase() {
-                piece_color = PieceColor::BLACK;
+            match symbol {
+                ' ' => break,
+                '/' => {
+                    y -= 1;
+                    x = 1;
+                }
+                '0'..='9' => x += symbol as i32 - '0' as i32,
+                _ => {
+                    let piece_color = PieceColor::from_bool(symbol.is_ascii_uppercase());
+                    pieces.push(Piece::new(piece_color, PieceType::from_symbol(symbol), Vec2::new(x, y)));
+                    x += 1
+                }
             }
-            else {
-                piece_color = PieceColor::WHITE;
+        }
+        
+        // kings and rooks without a right in the castling field count as moved
+        let rights = fen.split(' ').nth(2).unwrap_or("KQkq");
+        for piece in pieces.iter_mut() {
+            if !State::keeps_castling_right(piece, rights) {
+                piece.moved();
             }
-            let piece_type: PieceType = name_to_type(symbol_to_name(symbol));
-            pieces.push(Piece::new(piece_color, piece_type, Vec2::new(x, y)));
-            x += 1
         }
         
-        let to_move = PieceColor::WHITE;
+        let to_move = match fen.split(' ').nth(1) {
+            Some("b") => PieceColor::BLACK,
+            _ => PieceColor::WHITE,
+        };
         let half_moves = 0;
         let full_moves = 0;
         let promotion_lines = vec![1,8];
         let boundaries = [Vec2::new(0, 9), Vec2::new(9, 0)];
         let config = Config::new(boundaries, promotion_lines);
         
-        State { pieces, to_move, half_moves, full_moves, config, previous_move: None }
+        let mut state = State { pieces: vec![], mailbox: [None; 64], bitboards: Bitboards::new(), hash: 0, checkers: 0, pinned: 0, to_move, half_moves, full_moves, config, previous_move: None };
+        state.bulk_load(pieces);
+        state
     }
     
-    pub fn get_pieces(&self) -> Vec<Piece> {
-        return self.pieces.clone();
+    fn keeps_castling_right(piece: &Piece, rights: &str) -> bool {
+        let sq = match square(*piece.get_position()) {
+            Some(sq) => sq,
+            None => return true,
+        };
+        CASTLING_SQUARES.iter().zip("KQkq".chars()).any(|(&(king_sq, rook_sq, piece_color), symbol)| {
+            let home_sq = match piece.get_piece_type() {
+                PieceType::KING => king_sq,
+                PieceType::ROOK => rook_sq,
+                _ => return true,
+            };
+            (piece.get_color() == piece_color) && (sq == home_sq) && rights.contains(symbol)
+        })
     }
     
-    pub fn get_piece_at(&self, pos: Vec2) -> Option<&Piece> {
-        for piece_idx in 0..self.pieces.len() {
-            let piece_pos = self.pieces[piece_idx].get_position();
-            if (piece_pos.x == pos.x) && (piece_pos.y == pos.y) {
-                return Some(&self.pieces[piece_idx])
-            }
+    // index, bitboards, hash and check info for a whole piece list in one pass
+    fn bulk_load(&mut self, pieces: Vec<Piece>) {
+        self.mailbox = [None; 64];
+        self.bitboards = Bitboards::new();
+        self.hash = 0;
+        for idx in 0..pieces.len() {
+            let pos = *pieces[idx].get_position();
+            self.set_square(pos, Some(idx));
+            self.toggle_piece(&pieces[idx], pos);
         }
-        return None
+        self.pieces = pieces;
+        self.hash ^= self.position_key();
+        self.update_check_info();
     }
     
-    fn find_piece_idx(&self, piece: Piece) -> Option<usize> {
-        let mut same_idx: usize = usize::MAX;
-        for idx in 0..self.pieces.len() {
-            if self.pieces[idx] == piece {
-                same_idx = idx;
-                break;
+    pub fn compute_hash(&self) -> u64 {
+        let mut hash = 0;
+        for piece in &self.pieces {
+            if piece.is_alive() {
+                hash ^= piece_key(piece.get_color(), piece.get_piece_type(), *piece.get_position());
             }
         }
-        if same_idx < self.pieces.len() {
-            return Some(same_idx);
+        hash ^ self.position_key()
+    }
+    
+    // side to move, en passant and castling part of the hash
+    fn position_key(&self) -> u64 {
+        let side = match self.to_move {
+            PieceColor::WHITE => 0,
+            PieceColor::BLACK => SIDE_KEY,
+        };
+        side ^ en_passant_key(self.en_passant_square()) ^ castling_key(self.castling_rights())
+    }
+    
+    fn is_unmoved(&self, sq: usize, piece_type: PieceType, piece_color: PieceColor) -> bool {
+        match self.mailbox[sq] {
+            Some(idx) => {
+                let piece = &self.pieces[idx as usize];
+                (piece.get_piece_type() == piece_type) && (piece.get_color() == piece_color) && !piece.has_moved()
+            }
+            None => false,
         }
-        None
     }
     
-    pub fn find(&self, piece_type: PieceType, piece_color: PieceColor) -> Vec<Piece> {
-        let mut result: Vec<Piece> = vec![];
-        for piece in self.pieces.clone() {
-            if (piece.get_piece_type() == piece_type) && (piece.get_color() == piece_color) {
-                result.push(piece.clone());
+    fn castling_rights(&self) -> u8 {
+        let mut rights = 0;
+        for idx in 0..CASTLING_SQUARES.len() {
+            let (king_sq, rook_sq, piece_color) = CASTLING_SQUARES[idx];
+            if self.is_unmoved(king_sq, PieceType::KING, piece_color) && self.is_unmoved(rook_sq, PieceType::ROOK, piece_color) {
+                rights |= 1 << idx;
             }
         }
-        return result;
+        rights
+    }
+    
+    fn set_square(&mut self, pos: Vec2, idx: Option<usize>) {
+        if let Some(sq) = square(pos) {
+            self.mailbox[sq] = idx.map(|idx| idx as u8);
+        }
+    }
+    
+    fn toggle_piece(&mut self, piece: &Piece, pos: Vec2) {
+        if let Some(sq) = square(pos) {
+            self.bitboards.toggle(piece.get_color(), piece.get_piece_type(), sq);
+        }
+        self.hash ^= piece_key(piece.get_color(), piece.get_piece_type(), pos);
+    }
+    
+    pub fn get_pieces(&self) -> Vec<Piece> {
+        return self.pieces.clone();
+    }
+    
+    pub fn get_bitboards(&self) -> &Bitboards {
+        return &self.bitboards;
+    }
+    
+    pub fn get_hash(&self) -> u64 {
+        return self.hash;
+    }
+    
+    pub fn get_to_move(&self) -> PieceColor {
+        return self.to_move;
+    }
+    
+    pub fn get_piece_at(&self, pos: Vec2) -> Option<&Piece> {
+        let idx = self.mailbox[square(pos)?]?;
+        Some(&self.pieces[idx as usize])
     }
     
-    fn switch_to_move(&self) -> PieceColor {
-        match self.to_move {
-            PieceColor::BLACK => PieceColor::WHITE,
-            PieceColor::WHITE => PieceColor::BLACK,
+    fn find_piece_idx(&self, piece: Piece) -> Option<usize> {
+        let idx = self.mailbox[square(*piece.get_position())?]? as usize;
+        if self.pieces[idx] == piece {
+            return Some(idx);
         }
+        None
+    }
+    
+    pub fn find(&self, piece_type: PieceType, piece_color: PieceColor) -> Vec<Piece> {
+        self.pieces_in(self.bitboards.get(piece_color, piece_type)).cloned().collect()
+    }
+    
+    pub fn get_pieces_of(&self, piece_color: PieceColor) -> impl Iterator<Item = &Piece> {
+        self.pieces_in(self.bitboards.color(piece_color))
+    }
+    
+    fn pieces_in(&self, squares: Bitboard) -> impl Iterator<Item = &Piece> {
+        iter_bits(squares).map(|sq| &self.pieces[self.mailbox[sq].unwrap() as usize])
     }
     
     pub fn make_move(self, next_move: Move) -> State {
+        let hash = self.hash ^ SIDE_KEY ^ en_passant_key(self.en_passant_square()) ^ castling_key(self.castling_rights());
         let pieces = self.pieces.clone();
-        let to_move: PieceColor = self.switch_to_move();
+        let mailbox = self.mailbox;
+        let bitboards = self.bitboards.clone();
+        let to_move: PieceColor = self.to_move.opposite();
         let half_moves: usize = self.half_moves + 1;
         let full_moves: usize = self.full_moves + match to_move {
             PieceColor::WHITE => 1,
             PieceColor::BLACK => 0,
         };
         let config = self.config;
-        let previous_move = Some(next_move.clone());
+        let previous_move = Some(next_move);
         
-        let mut state = State { pieces, to_move, half_moves, full_moves, config, previous_move};
+        let mut state = State { pieces, mailbox, bitboards, hash, checkers: 0, pinned: 0, to_move, half_moves, full_moves, config, previous_move};
         
         if !next_move.castling {
-            let idx = state.find_piece_idx(next_move.piece).expect("Piece does not exist.");
-            state.pieces[idx].set_position(next_move.end);
-            
             if !next_move.target.is_none() {
-                let idx = state.find_piece_idx(next_move.target.unwrap()).unwrap();
-                state.pieces[idx].capture();
+                let target_idx = state.find_piece_idx(next_move.target.unwrap()).unwrap();
+                state.remove_piece(target_idx);
+            }
+            
+            let idx = state.relocate(&next_move.piece, next_move.end);
+            
+            if let Some(promotion) = next_move.promotion {
+                let pawn = state.pieces[idx];
+                state.toggle_piece(&pawn, next_move.end);
+                state.pieces[idx].promote(promotion);
+                let promoted = state.pieces[idx];
+                state.toggle_piece(&promoted, next_move.end);
             }
         }
         if next_move.castling {
-            todo!()
+            let castling_target = next_move.castling_target.unwrap();
+            let (king, rook) = match next_move.piece.get_piece_type() {
+                PieceType::KING => (next_move.piece, castling_target),
+                _ => (castling_target, next_move.piece),
+            };
+            let is_valid = match (square(*king.get_position()), square(*rook.get_position())) {
+                (Some(king_sq), Some(rook_sq)) => state.can_castle(king.get_color(), king_sq, rook_sq),
+                _ => false,
+            };
+            assert!(is_valid, "Invalid castling move.");
+            let king_start = *king.get_position();
+            let side = (rook.get_position().x - king_start.x).signum();
+            let king_end = king_start + Vec2::new(2 * side, 0);
+            state.relocate(&king, king_end);
+            state.relocate(&rook, king_end - Vec2::new(side, 0));
         }
-
+        
+        state.hash ^= en_passant_key(state.en_passant_square()) ^ castling_key(state.castling_rights());
+        state.update_check_info();
         state
     }
     
+    // swap-remove keeps the piece list compact, only the piece moved into the hole is reindexed
+    fn remove_piece(&mut self, idx: usize) {
+        let piece = self.pieces.swap_remove(idx);
+        self.set_square(*piece.get_position(), None);
+        self.toggle_piece(&piece, *piece.get_position());
+        if idx < self.pieces.len() {
+            let moved_pos = *self.pieces[idx].get_position();
+            self.set_square(moved_pos, Some(idx));
+        }
+    }
+    
+    fn relocate(&mut self, piece: &Piece, end: Vec2) -> usize {
+        let start = *piece.get_position();
+        let idx = self.find_piece_idx(*piece).expect("Piece does not exist.");
+        self.toggle_piece(piece, start);
+        self.toggle_piece(piece, end);
+        self.set_square(start, None);
+        self.set_square(end, Some(idx));
+        self.pieces[idx].set_position(end);
+        self.pieces[idx].moved();
+        idx
+    }
+
+    fn piece_at_square(&self, sq: usize) -> Option<Piece> {
+        let idx = self.mailbox[sq]?;
+        Some(self.pieces[idx as usize])
+    }
+    
+    fn king_square(&self, color: PieceColor) -> Option<usize> {
+        let king = self.bitboards.get(color, PieceType::KING);
+        if king == 0 {
+            return None;
+        }
+        Some(king.trailing_zeros() as usize)
+    }
+    
+    // checkers and pinned pieces of the side to move, cached once per position
+    fn update_check_info(&mut self) {
+        (self.checkers, self.pinned) = match self.king_square(self.to_move) {
+            Some(king_sq) => (self.compute_checkers(self.to_move, king_sq), self.compute_pinned(self.to_move, king_sq)),
+            None => (0, 0),
+        };
+    }
+    
+    fn check_info(&self, color: PieceColor, king_sq: usize) -> (Bitboard, Bitboard) {
+        if color == self.to_move {
+            return (self.checkers, self.pinned);
+        }
+        (self.compute_checkers(color, king_sq), self.compute_pinned(color, king_sq))
+    }
+    
+    /// Whether the king of `color` is attacked, false if it has no king.
+    pub fn is_in_check(&self, color: PieceColor) -> bool {
+        if color == self.to_move {
+            return self.checkers != 0;
+        }
+        match self.king_square(color) {
+            Some(king_sq) => self.compute_checkers(color, king_sq) != 0,
+            None => false,
+        }
+    }
+
+    fn compute_checkers(&self, color: PieceColor, king_sq: usize) -> Bitboard {
+        self.bitboards.attackers_to(king_sq, color.opposite(), self.bitboards.occupied())
+    }
+    
+    fn compute_pinned(&self, color: PieceColor, king_sq: usize) -> Bitboard {
+        let enemy = color.opposite();
+        let queens = self.bitboards.get(enemy, PieceType::QUEEN);
+        let snipers = (rook_attacks(king_sq, 0) & (self.bitboards.get(enemy, PieceType::ROOK) | queens))
+            | (bishop_attacks(king_sq, 0) & (self.bitboards.get(enemy, PieceType::BISHOP) | queens));
+        
+        let mut pinned = 0;
+        for sniper in iter_bits(snipers) {
+            let blockers = between(king_sq, sniper) & self.bitboards.occupied();
+            if blockers.count_ones() == 1 {
+                pinned |= blockers & self.bitboards.color(color);
+            }
+        }
+        pinned
+    }
+    
+    fn en_passant_square(&self) -> Option<usize> {
+        let prev_move = self.previous_move.as_ref()?;
+        if prev_move.piece.get_piece_type() != PieceType::PAWN {
+            return None;
+        }
+        if (prev_move.end - prev_move.start).abs().y != 2 {
+            return None;
+        }
+        square(Vec2::new(prev_move.end.x, (prev_move.start.y + prev_move.end.y) / 2))
+    }
+    
+    fn push_moves(&self, moves: &mut Vec<Move>, piece: &Piece, targets: Bitboard) {
+        let start = *piece.get_position();
+        for target_sq in iter_bits(targets) {
+            let target = self.piece_at_square(target_sq);
+            moves.push(Move::new(start, square_to_pos(target_sq), *piece, target, None, false, None, false));
+        }
+    }
+    
+    fn push_pawn_moves(&self, moves: &mut Vec<Move>, piece: &Piece, targets: Bitboard) {
+        let start = *piece.get_position();
+        for target_sq in iter_bits(targets) {
+            let end = square_to_pos(target_sq);
+            let target = self.piece_at_square(target_sq);
+            if !self.config.promotion_lines.contains(&end.y) {
+                moves.push(Move::new(start, end, *piece, target, None, false, None, false));
+                continue;
+            }
+            for promotion in [PieceType::BISHOP, PieceType::KNIGHT, PieceType::ROOK, PieceType::QUEEN] {
+                moves.push(Move::new(start, end, *piece, target, Some(promotion), false, None, false));
+            }
+        }
+    }
+    
+    fn push_castling_moves(&self, moves: &mut Vec<Move>, king_sq: usize) {
+        let color = self.to_move;
+        for (_, rook_sq, _) in CASTLING_SQUARES {
+            if !self.can_castle(color, king_sq, rook_sq) || !self.is_castling_path_safe(color, king_sq, rook_sq) {
+                continue;
+            }
+            let king = self.piece_at_square(king_sq).unwrap();
+            let rook = self.piece_at_square(rook_sq).unwrap();
+            moves.push(Move::new(*king.get_position(), *rook.get_position(), king, None, None, true, Some(rook), false));
+        }
+    }
+    
+    // unmoved king and rook on the home squares of one castling right, nothing in between
+    fn can_castle(&self, color: PieceColor, king_sq: usize, rook_sq: usize) -> bool {
+        CASTLING_SQUARES.contains(&(king_sq, rook_sq, color))
+            && self.is_unmoved(king_sq, PieceType::KING, color)
+            && self.is_unmoved(rook_sq, PieceType::ROOK, color)
+            && (between(king_sq, rook_sq) & self.bitboards.occupied() == 0)
+    }
+    
+    fn is_castling_path_safe(&self, color: PieceColor, king_sq: usize, rook_sq: usize) -> bool {
+        let king_target = if rook_sq > king_sq { king_sq + 2 } else { king_sq - 2 };
+        let path = bit(king_sq) | between(king_sq, king_target) | bit(king_target);
+        !iter_bits(path).any(|sq| self.bitboards.is_square_attacked(sq, color.opposite()))
+    }
+    
+    fn is_en_passant_legal(&self, color: PieceColor, start_sq: usize, captured_sq: usize, end_sq: usize) -> bool {
+        let king_sq = match self.king_square(color) {
+            Some(king_sq) => king_sq,
+            None => return true,
+        };
+        // simulate the capture on the occupancy only, it can expose the king along the rank
+        let occupied = self.bitboards.occupied() ^ bit(start_sq) ^ bit(captured_sq) | bit(end_sq);
+        self.bitboards.attackers_to(king_sq, color.opposite(), occupied) & !bit(captured_sq) == 0
+    }
+    
+    pub fn is_legal(&self, next_move: &Move) -> bool {
+        let color = next_move.piece.get_color();
+        let king_sq = match self.king_square(color) {
+            Some(king_sq) => king_sq,
+            None => return true,
+        };
+        let (start_sq, end_sq) = match (square(next_move.start), square(next_move.end)) {
+            (Some(start_sq), Some(end_sq)) => (start_sq, end_sq),
+            _ => return false,
+        };
+        let (checkers, pinned) = self.check_info(color, king_sq);
+        
+        if next_move.castling {
+            let (castling_king_sq, rook_sq) = match next_move.piece.get_piece_type() {
+                PieceType::KING => (start_sq, end_sq),
+                _ => (end_sq, start_sq),
+            };
+            if (castling_king_sq != king_sq) || !self.can_castle(color, king_sq, rook_sq) {
+                return false;
+            }
+            return (checkers == 0) && self.is_castling_path_safe(color, king_sq, rook_sq);
+        }
+        if next_move.piece.get_piece_type() == PieceType::KING {
+            let occupied = self.bitboards.occupied() ^ bit(start_sq);
+            return self.bitboards.attackers_to(end_sq, color.opposite(), occupied) == 0;
+        }
+        let is_pawn = next_move.piece.get_piece_type() == PieceType::PAWN;
+        if is_pawn && next_move.en_passant && (Some(end_sq) == self.en_passant_square()) {
+            let captured_sq = square(Vec2::new(next_move.end.x, next_move.start.y)).unwrap();
+            return self.is_en_passant_legal(color, start_sq, captured_sq, end_sq);
+        }
+        
+        // nothing to resolve and the piece is free to move
+        if (checkers == 0) && (pinned & bit(start_sq) == 0) {
+            return true;
+        }
+        if checkers.count_ones() > 1 {
+            return false;
+        }
+        if (pinned & bit(start_sq) != 0) && (line(king_sq, start_sq) & bit(end_sq) == 0) {
+            return false;
+        }
+        if checkers != 0 {
+            let check_mask = checkers | between(king_sq, checkers.trailing_zeros() as usize);
+            return check_mask & bit(end_sq) != 0;
+        }
+        true
+    }
+    
+    pub fn generate_legal_moves(&self) -> Vec<Move> {
+        let mut moves = Vec::with_capacity(MAX_MOVES);
+        self.generate_moves(!0, &mut moves);
+        moves
+    }
+    
+    /// Fills `moves` with the legal moves, reusing its allocation.
+    pub fn generate_legal_moves_into(&self, moves: &mut Vec<Move>) {
+        moves.clear();
+        self.generate_moves(!0, moves);
+    }
+    
+    pub fn generate_piece_moves(&self, pos: Vec2) -> Vec<Move> {
+        let mut moves = vec![];
+        if let Some(sq) = square(pos) {
+            self.generate_moves(bit(sq), &mut moves);
+        }
+        moves
+    }
+    
+    fn generate_moves(&self, from: Bitboard, moves: &mut Vec<Move>) {
+        let color = self.to_move;
+        let enemy = color.opposite();
+        let occupied = self.bitboards.occupied();
+        let own = self.bitboards.color(color);
+        let enemies = self.bitboards.color(enemy);
+        
+        let mut checkers = 0;
+        let mut pinned = 0;
+        let king_sq = self.king_square(color);
+        if let Some(king_sq) = king_sq {
+            (checkers, pinned) = self.check_info(color, king_sq);
+            
+            if from & bit(king_sq) != 0 {
+                let king = self.piece_at_square(king_sq).unwrap();
+                let mut targets = 0;
+                for target_sq in iter_bits(king_attacks(king_sq) & !own) {
+                    if self.bitboards.attackers_to(target_sq, enemy, occupied ^ bit(king_sq)) == 0 {
+                        targets |= bit(target_sq);
+                    }
+                }
+                self.push_moves(moves, &king, targets);
+                if checkers == 0 {
+                    self.push_castling_moves(moves, king_sq);
+                }
+            }
+            
+            // only the king can answer a double check
+            if checkers.count_ones() > 1 {
+                return;
+            }
+        }
+        
+        let check_mask = match checkers {
+            0 => !0,
+            _ => checkers | between(king_sq.unwrap(), checkers.trailing_zeros() as usize),
+        };
+        
+        for sq in iter_bits(own & from & !self.bitboards.get(color, PieceType::KING)) {
+            let piece = self.piece_at_square(sq).unwrap();
+            let pin_mask = match pinned & bit(sq) {
+                0 => !0,
+                _ => line(king_sq.unwrap(), sq),
+            };
+            let targets = match piece.get_piece_type() {
+                PieceType::PAWN => {
+                    let forward: i32 = match color {
+                        PieceColor::WHITE => 8,
+                        PieceColor::BLACK => -8,
+                    };
+                    let start_rank = match color {
+                        PieceColor::WHITE => 1,
+                        PieceColor::BLACK => 6,
+                    };
+                    let mut targets = pawn_attacks(color, sq) & enemies;
+                    let single = sq as i32 + forward;
+                    if (0..64).contains(&single) && (occupied & bit(single as usize) == 0) {
+                        targets |= bit(single as usize);
+                        let double = (single + forward) as usize;
+                        if (sq / 8 == start_rank) && (occupied & bit(double) == 0) {
+                            targets |= bit(double);
+                        }
+                    }
+                    self.push_pawn_moves(moves, &piece, targets & check_mask & pin_mask);
+                    continue;
+                }
+                PieceType::KNIGHT => knight_attacks(sq),
+                PieceType::BISHOP => bishop_attacks(sq, occupied),
+                PieceType::ROOK => rook_attacks(sq, occupied),
+                PieceType::QUEEN => rook_attacks(sq, occupied) | bishop_attacks(sq, occupied),
+                _ => 0,
+            };
+            self.push_moves(moves, &piece, targets & !own & check_mask & pin_mask);
+        }
+        
+        if let Some(ep_sq) = self.en_passant_square() {
+            let captured_sq = square(self.previous_move.as_ref().unwrap().end).unwrap();
+            for sq in iter_bits(pawn_attacks(enemy, ep_sq) & self.bitboards.get(color, PieceType::PAWN) & from) {
+                if !self.is_en_passant_legal(color, sq, captured_sq, ep_sq) {
+                    continue;
+                }
+                let piece = self.piece_at_square(sq).unwrap();
+                let target = self.piece_at_square(captured_sq);
+                moves.push(Move::new(*piece.get_position(), square_to_pos(ep_sq), piece, target, None, false, None, true));
+            }
+        }
+    }
+    
 }
 
 impl fmt::Display for State {
     fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
-            let mut result = String::new();
-            for y in (1..9).rev() {
-                for x in 1..9 {
-                    let piece = self.get_piece_at(Vec2::new(x, y));
-                    let piece: &Piece = match piece {
-                        Some(_) => piece.unwrap(),
-                        None => {
-                            result += ".";
-                            continue
-                        }
-                    };
-                    result += piece.get_symbol().to_string().as_str();
+            let mut result = String::with_capacity(72);
+            for rank in (0..8).rev() {
+                for file in 0..8 {
+                    match self.mailbox[rank * 8 + file] {
+                        Some(idx) => result.push(self.pieces[idx as usize].get_symbol()),
+                        None => result.push('.'),
+                    }
                 }
-                result += "\n";
+                result.push('\n');
             }
             write!(f, "{}", result,)
        }
@@ -0,0 +1,104 @@
+use crate::bitboard::Bitboard;
+
+// Lookup tables evaluated at compile time. Ray directions 0..4 point towards
+// higher square indices, 4..8 towards lower ones.
+const DIRECTIONS: [(i32, i32); 8] = [(0, 1), (1, 0), (1, 1), (-1, 1), (0, -1), (-1, 0), (-1, -1), (1, -1)];
+const KNIGHT_OFFSETS: [(i32, i32); 8] = [(-1, 2), (1, 2), (-1, -2), (1, -2), (2, -1), (2, 1), (-2, -1), (-2, 1)];
+
+pub const ROOK_DIRECTIONS: [usize; 4] = [0, 1, 4, 5];
+pub const BISHOP_DIRECTIONS: [usize; 4] = [2, 3, 6, 7];
+
+pub static RAYS: [[Bitboard; 64]; 8] = build_rays();
+pub static KNIGHT_ATTACKS: [Bitboard; 64] = build_step_attacks(&KNIGHT_OFFSETS);
+pub static KING_ATTACKS: [Bitboard; 64] = build_step_attacks(&DIRECTIONS);
+pub static PAWN_ATTACKS: [[Bitboard; 64]; 2] = [
+    build_step_attacks(&[(-1, -1), (1, -1)]),
+    build_step_attacks(&[(-1, 1), (1, 1)]),
+];
+pub static BETWEEN: [[Bitboard; 64]; 64] = build_between();
+pub static LINE: [[Bitboard; 64]; 64] = build_line();
+
+const fn offset_square(sq: usize, dx: i32, dy: i32) -> i32 {
+    let x = (sq % 8) as i32 + dx;
+    let y = (sq / 8) as i32 + dy;
+    if (x < 0) || (x > 7) || (y < 0) || (y > 7) {
+        return -1;
+    }
+    y * 8 + x
+}
+
+const fn build_step_attacks(offsets: &[(i32, i32)]) -> [Bitboard; 64] {
+    let mut table = [0; 64];
+    let mut sq = 0;
+    while sq < 64 {
+        let mut idx = 0;
+        while idx < offsets.len() {
+            let target = offset_square(sq, offsets[idx].0, offsets[idx].1);
+            if target >= 0 {
+                table[sq] |= 1 << target;
+            }
+            idx += 1;
+        }
+        sq += 1;
+    }
+    table
+}
+
+const fn build_rays() -> [[Bitboard; 64]; 8] {
+    let mut table = [[0; 64]; 8];
+    let mut dir = 0;
+    while dir < 8 {
+        let mut sq = 0;
+        while sq < 64 {
+            let mut target = offset_square(sq, DIRECTIONS[dir].0, DIRECTIONS[dir].1);
+            while target >= 0 {
+                table[dir][sq] |= 1 << target;
+                target = offset_square(target as usize, DIRECTIONS[dir].0, DIRECTIONS[dir].1);
+            }
+            sq += 1;
+        }
+        dir += 1;
+    }
+    table
+}
+
+const fn build_between() -> [[Bitboard; 64]; 64] {
+    let mut table = [[0; 64]; 64];
+    let mut dir = 0;
+    while dir < 8 {
+        let mut from = 0;
+        while from < 64 {
+            let mut path: Bitboard = 0;
+            let mut target = offset_square(from, DIRECTIONS[dir].0, DIRECTIONS[dir].1);
+            while target >= 0 {
+                table[from][target as usize] = path;
+                path |= 1 << target;
+                target = offset_square(target as usize, DIRECTIONS[dir].0, DIRECTIONS[dir].1);
+            }
+            from += 1;
+        }
+        dir += 1;
+    }
+    table
+}
+
+const fn build_line() -> [[Bitboard; 64]; 64] {
+    let rays = build_rays();
+    let mut table = [[0; 64]; 64];
+    let mut dir = 0;
+    while dir < 4 {
+        let mut from = 0;
+        while from < 64 {
+            let line = rays[dir][from] | rays[dir + 4][from] | (1 << from);
+            let mut target = offset_square(from, DIRECTIONS[dir].0, DIRECTIONS[dir].1);
+            while target >= 0 {
+                table[from][target as usize] = line;
+                table[target as usize][from] = line;
+                target = offset_square(target as usize, DIRECTIONS[dir].0, DIRECTIONS[dir].1);
+            }
+            from += 1;
+        }
+        dir += 1;
+    }
+    table
+}
@@ -0,0 +1,75 @@
+use glam::IVec2 as Vec2;
+use crate::bitboard::square;
+use crate::pieces::{PieceColor, PieceType};
+
+// Zobrist keys generated at compile time from a fixed seed, so hashes are
+// stable between runs.
+const SEED: u64 = 0xC0FFEE;
+
+pub static PIECE_KEYS: [[[u64; 64]; 6]; 2] = build_piece_keys();
+pub static EN_PASSANT_KEYS: [u64; 8] = build_keys::<8>(SEED ^ 0xE9);
+pub static CASTLING_KEYS: [u64; 4] = build_keys::<4>(SEED ^ 0xCA);
+pub const SIDE_KEY: u64 = splitmix64(SEED ^ 0x5D).1;
+
+const fn splitmix64(state: u64) -> (u64, u64) {
+    let state = state.wrapping_add(0x9E3779B97F4A7C15);
+    let mut z = state;
+    z = (z ^ (z >> 30)).wrapping_mul(0xBF58476D1CE4E5B9);
+    z = (z ^ (z >> 27)).wrapping_mul(0x94D049BB133111EB);
+    (state, z ^ (z >> 31))
+}
+
+const fn build_keys<const N: usize>(seed: u64) -> [u64; N] {
+    let mut keys = [0; N];
+    let mut state = seed;
+    let mut idx = 0;
+    while idx < N {
+        let (next_state, key) = splitmix64(state);
+        keys[idx] = key;
+        state = next_state;
+        idx += 1;
+    }
+    keys
+}
+
+const fn build_piece_keys() -> [[[u64; 64]; 6]; 2] {
+    let keys = build_keys::<768>(SEED);
+    let mut table = [[[0; 64]; 6]; 2];
+    let mut idx = 0;
+    while idx < 768 {
+        table[idx / 384][(idx / 64) % 6][idx % 64] = keys[idx];
+        idx += 1;
+    }
+    table
+}
+
+#[inline]
+pub fn piece_key(piece_color: PieceColor, piece_type: PieceType, pos: Vec2) -> u64 {
+    if piece_type == PieceType::NULL {
+        return 0;
+    }
+    match square(pos) {
+        Some(sq) => PIECE_KEYS[piece_color as usize][piece_type as usize - 1][sq],
+        None => 0,
+    }
+}
+
+#[inline]
+pub fn en_passant_key(ep_sq: Option<usize>) -> u64 {
+    match ep_sq {
+        Some(sq) => EN_PASSANT_KEYS[sq % 8],
+        None => 0,
+    }
+}
+
+/// Combined key of a castling rights mask, one bit per king/rook pair.
+#[inline]
+pub fn castling_key(rights: u8) -> u64 {
+    let mut key = 0;
+    for idx in 0..4 {
+        if rights & (1 << idx) != 0 {
+            key ^= CASTLING_KEYS[idx];
+        }
+    }
+    key
+}
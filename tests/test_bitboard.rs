@@ -0,0 +1,44 @@
+use quasar::bitboard::*;
+use quasar::pieces::*;
+use quasar::state::State;
+use glam::IVec2 as Vec2;
+
+#[test]
+fn test_square() {
+    assert_eq!(square(Vec2::new(1, 1)), Some(0));
+    assert_eq!(square(Vec2::new(8, 8)), Some(63));
+    assert_eq!(square(Vec2::new(0, 4)), None);
+    assert_eq!(square_to_pos(12), Vec2::new(5, 2));
+}
+
+#[test]
+fn test_between() {
+    // a1-h8 diagonal
+    assert_eq!(between(0, 63).count_ones(), 6);
+    // e1-h1
+    assert_eq!(between(4, 7), bit(5) | bit(6));
+    // knight jump shares no line
+    assert_eq!(between(1, 18), 0);
+}
+
+#[test]
+fn test_attackers_to() {
+    let state = State::from_fen("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1".to_owned());
+    let bitboards = state.get_bitboards();
+    assert_eq!(bitboards.get(PieceColor::WHITE, PieceType::PAWN), 0xff00);
+    assert_eq!(bitboards.occupied(), 0xffff00000000ffff);
+    // f3 is covered by the g1 knight and the e2/g2 pawns
+    assert_eq!(bitboards.attackers_to(21, PieceColor::WHITE, bitboards.occupied()).count_ones(), 3);
+    assert!(!bitboards.is_square_attacked(28, PieceColor::BLACK));
+}
+
+#[test]
+fn test_slider_attacks() {
+    // rook on d4 blocked by pieces on d6 and f4
+    let occupied = bit(43) | bit(29);
+    assert_eq!(rook_attacks(27, occupied).count_ones(), 2 + 2 + 3 + 3);
+    assert_eq!(rook_attacks(0, 0).count_ones(), 14);
+    assert_eq!(bishop_attacks(27, 0).count_ones(), 13);
+    assert_eq!(knight_attacks(0), bit(10) | bit(17));
+    assert_eq!(line(0, 9), line(63, 18));
+}
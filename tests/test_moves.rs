@@ -0,0 +1,62 @@
+use quasar::moves::Generator;
+use quasar::state::State;
+use glam::IVec2 as Vec2;
+
+const START_FEN: &str = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1";
+
+fn targets(state: &State, pos: Vec2) -> Vec<Vec2> {
+    let piece = state.get_piece_at(pos).unwrap().clone();
+    let mut targets: Vec<Vec2> = Generator::new(piece, state.clone()).map(|piece_move| piece_move.end).collect();
+    targets.sort_by_key(|end| (end.x, end.y));
+    targets
+}
+
+#[test]
+fn test_generator_leapers() {
+    let state = State::from_fen(START_FEN.to_owned());
+    assert_eq!(targets(&state, Vec2::new(2, 1)), vec![Vec2::new(1, 3), Vec2::new(3, 3)]);
+    assert_eq!(targets(&state, Vec2::new(5, 1)), vec![]);
+    
+    let state = State::from_fen("8/8/8/8/8/8/8/N6K w - - 0 1".to_owned());
+    assert_eq!(targets(&state, Vec2::new(1, 1)), vec![Vec2::new(2, 3), Vec2::new(3, 2)]);
+    assert_eq!(targets(&state, Vec2::new(8, 1)).len(), 3);
+}
+
+#[test]
+fn test_generator_sliders() {
+    let state = State::from_fen("8/8/8/8/8/8/8/R6K w - - 0 1".to_owned());
+    assert_eq!(targets(&state, Vec2::new(1, 1)).len(), 13);
+    
+    let state = State::from_fen("8/8/8/8/3p4/8/8/B6K w - - 0 1".to_owned());
+    assert_eq!(targets(&state, Vec2::new(1, 1)), vec![Vec2::new(2, 2), Vec2::new(3, 3), Vec2::new(4, 4)]);
+}
+
+#[test]
+fn test_generator_bounds() {
+    let mut state = State::from_fen("8/8/8/8/8/8/8/N6K w - - 0 1".to_owned());
+    assert_eq!(state.config.bounds_mask(), u64::MAX);
+    
+    // Only files a-b remain inside the boundaries
+    state.config.boundaries = [Vec2::new(0, 9), Vec2::new(3, 0)];
+    assert_eq!(targets(&state, Vec2::new(1, 1)), vec![Vec2::new(2, 3)]);
+}
+
+#[test]
+fn test_generator_en_passant_flag_on_capture() {
+    let mut state = State::from_fen("N3k3/3p4/8/8/8/3n4/K1P4r/8 w - - 0 1".to_owned());
+    for (start, end) in [((1, 8), (2, 6)), ((4, 7), (4, 5))] {
+        let next_move = state.generate_piece_moves(Vec2::new(start.0, start.1))
+            .into_iter()
+            .find(|m| m.end == Vec2::new(end.0, end.1))
+            .unwrap();
+        state = state.make_move(next_move);
+    }
+    
+    // the c2 pawn is pinned by the rook, flagged captures must not slip through
+    let pawn = state.get_piece_at(Vec2::new(3, 2)).unwrap().clone();
+    let mut gen = Generator::new(pawn, state.clone());
+    while !gen.is_exhausted() {
+        assert!(gen.next_legal().is_none());
+    }
+    assert!(state.generate_piece_moves(Vec2::new(3, 2)).is_empty());
+}
@@ -99,4 +99,29 @@ fn test_symbol_to_name() {
     assert_eq!(symbol_to_name('q'), "queen");
     assert_eq!(symbol_to_name('K'), "king");
     assert_eq!(symbol_to_name('x'), "null")
-}
\ No newline at end of file
+}
+
+#[test]
+fn test_color_opposite() {
+    assert_eq!(PieceColor::WHITE.opposite(), PieceColor::BLACK);
+    assert_eq!(PieceColor::BLACK.opposite(), PieceColor::WHITE);
+}
+
+#[test]
+fn test_type_from_symbol() {
+    assert_eq!(PieceType::from_symbol('p'), PieceType::PAWN);
+    assert_eq!(PieceType::from_symbol('N'), PieceType::KNIGHT);
+    assert_eq!(PieceType::from_symbol('b'), PieceType::BISHOP);
+    assert_eq!(PieceType::from_symbol('R'), PieceType::ROOK);
+    assert_eq!(PieceType::from_symbol('q'), PieceType::QUEEN);
+    assert_eq!(PieceType::from_symbol('K'), PieceType::KING);
+    assert_eq!(PieceType::from_symbol('x'), PieceType::NULL);
+}
+
+#[test]
+fn test_type_to_symbol() {
+    assert_eq!(PieceType::NULL.to_symbol(), 'x');
+    assert_eq!(PieceType::KNIGHT.to_symbol(), 'n');
+    assert_eq!(Piece::new(PieceColor::BLACK, PieceType::QUEEN, Vec2::ZERO).get_symbol(), 'q');
+    assert_eq!(Piece::new(PieceColor::WHITE, PieceType::ROOK, Vec2::ZERO).get_symbol(), 'R');
+}
@@ -0,0 +1,227 @@
+use quasar::moves::{Generator, Move, MoveCache};
+use quasar::pieces::*;
+use quasar::state::{State, MAX_MOVES};
+use glam::IVec2 as Vec2;
+
+const START_FEN: &str = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1";
+
+#[test]
+fn test_get_piece_at() {
+    let state = State::from_fen(START_FEN.to_owned());
+    assert_eq!(state.get_piece_at(Vec2::new(5, 1)).unwrap().get_piece_type(), PieceType::KING);
+    assert_eq!(state.get_piece_at(Vec2::new(4, 8)).unwrap().get_symbol(), 'q');
+    assert!(state.get_piece_at(Vec2::new(4, 4)).is_none());
+}
+
+#[test]
+fn test_get_piece_at_after_capture() {
+    let state = State::from_fen("4k3/8/8/3p4/4P3/8/8/4K3 w - - 0 1".to_owned());
+    let pawn = state.get_piece_at(Vec2::new(5, 4)).unwrap().clone();
+    let target = state.get_piece_at(Vec2::new(4, 5)).unwrap().clone();
+    let capture = Move::new(Vec2::new(5, 4), Vec2::new(4, 5), pawn, Some(target), None, false, None, false);
+    let state = state.make_move(capture);
+    
+    assert!(state.get_piece_at(Vec2::new(5, 4)).is_none());
+    assert_eq!(state.get_piece_at(Vec2::new(4, 5)).unwrap().get_color(), PieceColor::WHITE);
+    assert_eq!(state.get_pieces().len(), 3);
+    assert_eq!(state.get_piece_at(Vec2::new(5, 8)).unwrap().get_piece_type(), PieceType::KING);
+}
+
+fn perft(state: &State, depth: usize) -> usize {
+    assert_eq!(state.get_hash(), state.compute_hash());
+    let mut moves = Vec::with_capacity(MAX_MOVES);
+    state.generate_legal_moves_into(&mut moves);
+    if depth == 1 {
+        return moves.len();
+    }
+    let mut nodes = 0;
+    for next_move in moves {
+        nodes += perft(&state.clone().make_move(next_move), depth - 1);
+    }
+    nodes
+}
+
+#[test]
+fn test_perft_start_position() {
+    let state = State::from_fen(START_FEN.to_owned());
+    assert_eq!(perft(&state, 1), 20);
+    assert_eq!(perft(&state, 2), 400);
+    assert_eq!(perft(&state, 3), 8902);
+}
+
+#[test]
+fn test_legal_moves_pins_and_checks() {
+    // kiwipete, castling both ways
+    let state = State::from_fen("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1".to_owned());
+    assert_eq!(perft(&state, 1), 48);
+    assert_eq!(perft(&state, 2), 2039);
+    // rook pins and discovered checks along the fifth rank
+    let state = State::from_fen("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1".to_owned());
+    assert_eq!(perft(&state, 1), 14);
+    assert_eq!(perft(&state, 2), 191);
+    assert_eq!(perft(&state, 3), 2812);
+}
+
+#[test]
+fn test_is_legal() {
+    let state = State::from_fen("4k3/4r3/8/8/8/8/4B3/4K3 w - - 0 1".to_owned());
+    let bishop = state.get_piece_at(Vec2::new(5, 2)).unwrap().clone();
+    let king = state.get_piece_at(Vec2::new(5, 1)).unwrap().clone();
+    
+    // the bishop is pinned against the king
+    let pinned_move = Move::new(Vec2::new(5, 2), Vec2::new(4, 3), bishop, None, None, false, None, false);
+    assert!(!state.is_legal(&pinned_move));
+    let king_move = Move::new(Vec2::new(5, 1), Vec2::new(4, 1), king, None, None, false, None, false);
+    assert!(state.is_legal(&king_move));
+    
+    let state = State::from_fen("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1".to_owned());
+    for next_move in state.generate_legal_moves() {
+        assert!(state.is_legal(&next_move));
+    }
+}
+
+#[test]
+fn test_fen_castling_rights() {
+    let castlings = |fen: &str| State::from_fen(fen.to_owned()).generate_legal_moves().iter().filter(|m| m.castling).count();
+    assert_eq!(castlings("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1"), 2);
+    assert_eq!(castlings("r3k2r/8/8/8/8/8/8/R3K2R w Kq - 0 1"), 1);
+    assert_eq!(castlings("r3k2r/8/8/8/8/8/8/R3K2R w kq - 0 1"), 0);
+    assert_eq!(castlings("r3k2r/8/8/8/8/8/8/R3K2R w - - 0 1"), 0);
+    
+    let all_rights = State::from_fen("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1".to_owned());
+    let no_rights = State::from_fen("r3k2r/8/8/8/8/8/8/R3K2R w - - 0 1".to_owned());
+    assert_ne!(all_rights.get_hash(), no_rights.get_hash());
+    assert_eq!(no_rights.get_hash(), no_rights.compute_hash());
+}
+
+#[test]
+fn test_is_legal_castling_off_home_squares() {
+    let state = State::from_fen("4k3/8/8/8/8/8/8/RK6 w - - 0 1".to_owned());
+    let king = state.get_piece_at(Vec2::new(2, 1)).unwrap().clone();
+    let rook = state.get_piece_at(Vec2::new(1, 1)).unwrap().clone();
+    
+    let king_castling = Move::new(Vec2::new(2, 1), Vec2::new(1, 1), king, None, None, true, Some(rook), false);
+    assert!(!state.is_legal(&king_castling));
+    let rook_castling = Move::new(Vec2::new(1, 1), Vec2::new(2, 1), rook, None, None, true, Some(king), false);
+    assert!(!state.is_legal(&rook_castling));
+    assert!(state.generate_legal_moves().iter().all(|next_move| !next_move.castling));
+    
+    for piece in [king, rook] {
+        let mut gen = Generator::new(piece, state.clone());
+        while !gen.is_exhausted() {
+            if let Some(next_move) = gen.next_legal() {
+                assert!(!next_move.castling);
+            }
+        }
+    }
+}
+
+#[test]
+#[should_panic(expected = "Invalid castling move.")]
+fn test_make_move_castling_off_home_squares() {
+    let state = State::from_fen("4k3/8/8/8/8/8/8/RK6 w - - 0 1".to_owned());
+    let king = state.get_piece_at(Vec2::new(2, 1)).unwrap().clone();
+    let rook = state.get_piece_at(Vec2::new(1, 1)).unwrap().clone();
+    state.make_move(Move::new(Vec2::new(2, 1), Vec2::new(1, 1), king, None, None, true, Some(rook), false));
+}
+
+#[test]
+fn test_is_in_check() {
+    let state = State::from_fen("4k3/8/8/8/8/8/8/4K2R w - - 0 1".to_owned());
+    assert!(!state.is_in_check(PieceColor::WHITE));
+    assert!(!state.is_in_check(PieceColor::BLACK));
+    
+    // black is not to move, so its check is computed from the king square
+    let state = State::from_fen("7k/8/8/8/8/8/8/4K2R w - - 0 1".to_owned());
+    assert!(state.is_in_check(PieceColor::BLACK));
+    assert!(!state.is_in_check(PieceColor::WHITE));
+    
+    // white to move answers from the cached checkers
+    let state = State::from_fen("4k3/8/8/8/8/5n2/8/4K3 w - - 0 1".to_owned());
+    assert!(state.is_in_check(PieceColor::WHITE));
+    assert!(!state.is_in_check(PieceColor::BLACK));
+}
+
+#[test]
+fn test_pawn_on_last_rank() {
+    let state = State::from_fen("P3k3/8/8/8/8/8/8/4K3 w - - 0 1".to_owned());
+    assert!(state.generate_piece_moves(Vec2::new(1, 8)).is_empty());
+    let state = State::from_fen("4k3/8/8/8/8/8/8/p3K3 b - - 0 1".to_owned());
+    assert!(state.generate_piece_moves(Vec2::new(1, 1)).is_empty());
+}
+
+#[test]
+fn test_black_to_move() {
+    let state = State::from_fen("4k3/8/8/8/8/8/n7/4R2K b - - 0 1".to_owned());
+    assert_eq!(state.get_to_move(), PieceColor::BLACK);
+    assert!(state.is_in_check(PieceColor::BLACK));
+    
+    // only king moves answer the rook check
+    let moves = state.generate_legal_moves();
+    assert!(!moves.is_empty());
+    assert!(moves.iter().all(|next_move| next_move.piece.get_piece_type() == PieceType::KING));
+}
+
+#[test]
+fn test_hash_transposition() {
+    let state = State::from_fen(START_FEN.to_owned());
+    let start_hash = state.get_hash();
+    
+    // knights out and back again
+    let mut current = state;
+    for (start, end) in [((7, 1), (6, 3)), ((7, 8), (6, 6)), ((6, 3), (7, 1)), ((6, 6), (7, 8))] {
+        let next_move = current.generate_piece_moves(Vec2::new(start.0, start.1))
+            .into_iter()
+            .find(|m| m.end == Vec2::new(end.0, end.1))
+            .unwrap();
+        current = current.make_move(next_move);
+        if current.get_to_move() == PieceColor::BLACK {
+            assert_ne!(current.get_hash(), start_hash);
+        }
+    }
+    assert_eq!(current.get_hash(), start_hash);
+    
+    // side to move from the FEN is part of the hash
+    let black = State::from_fen("4k3/8/8/8/8/8/n7/4R2K b - - 0 1".to_owned());
+    let white = State::from_fen("4k3/8/8/8/8/8/n7/4R2K w - - 0 1".to_owned());
+    assert_eq!(black.get_hash(), black.compute_hash());
+    assert_ne!(black.get_hash(), white.get_hash());
+}
+
+#[test]
+fn test_move_cache() {
+    let state = State::from_fen(START_FEN.to_owned());
+    let mut cache = MoveCache::new(2);
+    assert!(cache.is_possible_move(&state, Vec2::new(5, 2), Vec2::new(5, 4)));
+    assert!(!cache.is_possible_move(&state, Vec2::new(5, 2), Vec2::new(5, 5)));
+    assert!(cache.is_possible_move(&state, Vec2::new(2, 1), Vec2::new(3, 3)));
+    assert!(!cache.is_possible_move(&state, Vec2::new(1, 1), Vec2::new(1, 3)));
+    assert_eq!(cache.len(), 2);
+    
+    let mut cache = MoveCache::new(0);
+    assert!(cache.is_possible_move(&state, Vec2::new(5, 2), Vec2::new(5, 4)));
+    assert_eq!(cache.len(), 1);
+}
+
+#[test]
+fn test_find_pieces() {
+    let state = State::from_fen(START_FEN.to_owned());
+    assert_eq!(state.find(PieceType::ROOK, PieceColor::WHITE).len(), 2);
+    assert_eq!(state.find(PieceType::KING, PieceColor::BLACK)[0].get_position(), &Vec2::new(5, 8));
+    assert_eq!(state.get_pieces_of(PieceColor::BLACK).count(), 16);
+    assert!(state.get_pieces_of(PieceColor::WHITE).all(|piece| piece.get_color() == PieceColor::WHITE));
+}
+
+#[test]
+fn test_display() {
+    let state = State::from_fen("4k3/8/8/3p4/4P3/8/8/4K3 w - - 0 1".to_owned());
+    assert_eq!(format!("{}", state), "....k...\n........\n........\n...p....\n....P...\n........\n........\n....K...\n");
+}
+
+#[test]
+fn test_perft_castling_and_promotion() {
+    let state = State::from_fen("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1".to_owned());
+    assert_eq!(perft(&state, 1), 6);
+    assert_eq!(perft(&state, 2), 264);
+    assert_eq!(perft(&state, 3), 9467);
+}